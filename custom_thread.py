@@ -2,107 +2,263 @@ import logging
 import threading
 import time
 import socket
+import selectors
 import re
-import sys
-import uuid
-
-import serial.tools.list_ports
 
 from utils import exit_script
 
 
+log = logging.getLogger(__name__)
+
+# Number of allowed connections to TCP server
+MAX_TCP_CONNECTIONS = 10
+# Max size of UDP datagram payload - fits in a single Ethernet frame (MTU 1500)
+UDP_MAX_DATAGRAM_SIZE = 1400
+# Socket send buffer sizes (in bytes)
+TCP_SNDBUF_SIZE = 64 * 1024
+UDP_SNDBUF_SIZE = 4 * 1024 * 1024
+# Serial port driver buffer size (in bytes) - used on Windows only
+SERIAL_BUFFER_SIZE = 4096
+# Max size of NMEA data (in bytes) waiting to be sent to a single TCP server client
+CLIENT_MAX_PENDING = 64 * 1024
+# Matches error number in serial exception message, e.g. '[Errno 2]'
+_BRACKET_RE = re.compile(r'\[(.*?)\]')
+
+
+def set_send_buffer(sock: socket.socket, size: int) -> None:
+    """
+    Function sets socket send buffer size and logs the size actually granted by the OS
+    (e.g. on Linux it is capped by 'net.core.wmem_max').
+    """
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, size)
+    sndbuf = sock.getsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF)
+    log.debug('Socket send buffer: requested %s bytes, granted %s bytes', size, sndbuf)
+
+
+def tcp_socket_setup(sock: socket.socket) -> None:
+    """
+    Function disables Nagle's algorithm and enlarges send buffer of the connected TCP socket.
+    """
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    set_send_buffer(sock, TCP_SNDBUF_SIZE)
+
+
+def udp_datagrams(payload: bytes, max_size: int = UDP_MAX_DATAGRAM_SIZE) -> list:
+    """
+    Function splits NMEA payload into UDP datagrams not exceeding 'max_size' bytes.
+    The single NMEA sentence is never split between two datagrams.
+    """
+    if len(payload) <= max_size:
+        return [payload]
+    datagrams = []
+    datagram = b''
+    for nmea in payload.splitlines(keepends=True):
+        if datagram and len(datagram) + len(nmea) > max_size:
+            datagrams.append(datagram)
+            datagram = b''
+        datagram += nmea
+    if datagram:
+        datagrams.append(datagram)
+    return datagrams
+
+
+# Lock guarding the NmeaMsg object shared between the sending threads and the main (user input) thread.
+# It is held only for the position update - never across any send/write call.
+_nmea_lock = threading.Lock()
+
+
+def tick_deadline(next_tick: float, interval: float = 1.0) -> float:
+    """
+    Function returns the next tick deadline (monotonic clock).
+    When the tick has overrun its deadline the schedule is re-anchored to the current time.
+    """
+    return max(next_tick + interval, time.perf_counter())
+
+
+def wait_next_tick(next_tick: float, interval: float = 1.0) -> float:
+    """
+    Function sleeps until the next tick deadline and returns it.
+    """
+    next_tick = tick_deadline(next_tick, interval)
+    time.sleep(max(next_tick - time.perf_counter(), 0))
+    return next_tick
+
+
+def set_heading_speed(nmea_obj, heading: float, speed: float) -> None:
+    """
+    Function sets the unit's targeted heading and speed on the NmeaMsg object.
+    """
+    with _nmea_lock:
+        nmea_obj.heading_targeted = heading
+        nmea_obj.speed_targeted = speed
+
+
+def next_payload(nmea_obj) -> bytes:
+    """
+    Function updates the NmeaMsg object (position, heading, speed) and returns encoded NMEA sentences.
+    """
+    with _nmea_lock:
+        next(nmea_obj)
+        return nmea_obj.payload
+
+
 def run_telnet_server_thread(srv_ip_address: str, srv_port: str, nmea_obj) -> None:
     """
     Function starts thread with TCP (telnet) server sending NMEA data to connected client (clients).
+    The single thread multiplexes new client connections, non-blocking writes to the clients
+    and the periodic (every second) NMEA data broadcast.
     """
-    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+    # Connected clients - {conn: TelnetClient}
+    clients = {}
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s, selectors.DefaultSelector() as sel:
+        # Allow immediate reuse of the local address after the script restart.
+        s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
         # Bind socket to local host and port.
         try:
             s.bind((srv_ip_address, srv_port))
         except socket.error as err:
             print(f'\n*** Bind failed. Error: {err.strerror}. ***')
-            print('Change IP/port settings or try again in next 2 minutes.')
+            print('Change IP/port settings and try again.')
             exit_script()
             # sys.exit()
         # Start listening on socket
-        s.listen(10)
+        s.listen(MAX_TCP_CONNECTIONS)
+        s.setblocking(False)
+        sel.register(s, selectors.EVENT_READ)
         print(f'\n*** Server listening on {srv_ip_address}:{srv_port}... ***\n')
+        next_tick = time.perf_counter()
         while True:
-            # Number of allowed connections to TCP server.
-            max_threads = 10
-            # Scripts waiting for client calls
-            # The server is blocked (suspended) and is waiting for a client connection.
-            conn, ip_add = s.accept()
-            # print(f'\n*** Connected with {ip_add[0]}:{ip_add[1]} ***')
-            logging.info(f'Connected with {ip_add[0]}:{ip_add[1]}')
-            thread_list = [thread.name for thread in threading.enumerate()]
-            if len([thread_name for thread_name in thread_list if thread_name.startswith('nmea_srv')]) < max_threads:
-                nmea_srv_thread = NmeaSrvThread(name=f'nmea_srv{uuid.uuid4().hex}',
-                                                daemon=True,
-                                                conn=conn,
-                                                ip_add=ip_add,
-                                                nmea_object=nmea_obj)
-                nmea_srv_thread.start()
-            else:
-                # Close connection if number of scheduler jobs > max_sched_jobs
-                conn.close()
-                # print(f'\n*** Connection closed with {ip_add[0]}:{ip_add[1]} ***')
-                logging.info(f'Connection closed with {ip_add[0]}:{ip_add[1]}')
+            # The server handles socket events until the next NMEA data broadcast.
+            for key, mask in sel.select(timeout=max(next_tick - time.perf_counter(), 0)):
+                if key.fileobj is s:
+                    accept_client(s, sel, clients)
+                    continue
+                client = clients[key.fileobj]
+                if mask & selectors.EVENT_READ and not client.receive():
+                    drop_client(client, sel, clients)
+                elif mask & selectors.EVENT_WRITE:
+                    send_to_client(client, sel, clients)
+            if time.perf_counter() >= next_tick:
+                broadcast_nmea(next_payload(nmea_obj), sel, clients)
+                next_tick = tick_deadline(next_tick)
 
 
-class NmeaSrvThread(threading.Thread):
+class TelnetClient:
     """
-    A class that represents a thread dedicated for TCP (telnet) server-client connection.
+    A class that represents TCP (telnet) server client with NMEA data not yet sent to it.
     """
-    def __init__(self, nmea_object, ip_add=None, conn=None, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        self.heading = None
-        self.speed = None
-        self._heading_cache = 0
-        self._speed_cache = 0
+    def __init__(self, conn: socket.socket, ip_add: tuple):
         self.conn = conn
         self.ip_add = ip_add
-        self.nmea_object = nmea_object
-        self._lock = threading.RLock()
+        self.pending = bytearray()
 
-    def set_speed(self, speed):
-        with self._lock:
-            self.speed = speed
+    def receive(self) -> bool:
+        """
+        Discard data sent by the client (e.g. telnet negotiation). Returns False when the client has disconnected.
+        """
+        try:
+            return bool(self.conn.recv(1024))
+        except BlockingIOError:
+            return True
+        except OSError:
+            return False
 
-    def set_heading(self, heading):
-        with self._lock:
-            self.heading = heading
+    def send_pending(self) -> None:
+        """
+        Send as much of the pending NMEA data as the socket send buffer accepts - never blocks.
+        """
+        try:
+            sent = self.conn.send(self.pending)
+        except BlockingIOError:
+            return
+        del self.pending[:sent]
+
+
+def accept_client(srv_sock: socket.socket, sel: selectors.BaseSelector, clients: dict) -> None:
+    """
+    Function accepts new client connection and registers it for NMEA data broadcast.
+    """
+    try:
+        conn, ip_add = srv_sock.accept()
+    except BlockingIOError:
+        return
+    except OSError as err:
+        # E.g. connection aborted before accept or too many open files - the server keeps running
+        log.warning('Accept failed: %s', err)
+        return
+    # print(f'\n*** Connected with {ip_add[0]}:{ip_add[1]} ***')
+    log.info('Connected with %s:%s', ip_add[0], ip_add[1])
+    if len(clients) < MAX_TCP_CONNECTIONS:
+        try:
+            tcp_socket_setup(conn)
+            # Slow client can't stall the broadcast to other clients.
+            conn.setblocking(False)
+            sel.register(conn, selectors.EVENT_READ)
+        except OSError:
+            # Connection already reset by the peer
+            conn.close()
+            log.info('Connection closed with %s:%s', ip_add[0], ip_add[1])
+            return
+        clients[conn] = TelnetClient(conn, ip_add)
+    else:
+        # Close connection if number of connected clients >= MAX_TCP_CONNECTIONS
+        conn.close()
+        # print(f'\n*** Connection closed with {ip_add[0]}:{ip_add[1]} ***')
+        log.info('Connection closed with %s:%s', ip_add[0], ip_add[1])
+
+
+def drop_client(client: TelnetClient, sel: selectors.BaseSelector, clients: dict) -> None:
+    """
+    Function unregisters the client, shuts down the connection (sends FIN promptly) and closes the socket.
+    """
+    sel.unregister(client.conn)
+    del clients[client.conn]
+    try:
+        client.conn.shutdown(socket.SHUT_RDWR)
+    except OSError:
+        # Connection already reset by the peer
+        pass
+    client.conn.close()
+    # print(f'\n*** Connection closed with {client.ip_add[0]}:{client.ip_add[1]} ***')
+    log.info('Connection closed with %s:%s', client.ip_add[0], client.ip_add[1])
+
+
+def send_to_client(client: TelnetClient, sel: selectors.BaseSelector, clients: dict) -> None:
+    """
+    Function sends pending NMEA data to the client. The client's socket is watched for write readiness
+    only while some data is still pending. Disconnected client is removed.
+    """
+    try:
+        client.send_pending()
+    except OSError:
+        drop_client(client, sel, clients)
+        return
+    events = selectors.EVENT_READ | selectors.EVENT_WRITE if client.pending else selectors.EVENT_READ
+    if sel.get_key(client.conn).events != events:
+        sel.modify(client.conn, events)
 
-    def run(self):
-        while True:
-            timer_start = time.perf_counter()
-            with self._lock:
-                # Nmea object speed and heading update
-                if self.heading and self.heading != self._heading_cache:
-                    self.nmea_object.heading_targeted = self.heading
-                    self._heading_cache = self.heading
-                if self.speed and self.speed != self._speed_cache:
-                    self.nmea_object.speed_targeted = self.speed
-                    self._speed_cache = self.speed
-                # The following commands allow the same copies of NMEA data is sent on all threads
-                # Only first thread in a list can iterate over NMEA object (the same nmea output in all threads)
-                thread_list = [thread.name for thread in threading.enumerate() if thread.name.startswith('nmea_srv')]
-                current_thread_name = threading.current_thread().name
-                if len(thread_list) > 1 and current_thread_name != thread_list[0]:
-                    nmea_list = [f'{_}' for _ in self.nmea_object.nmea_sentences]
-                else:
-                    nmea_list = [f'{_}' for _ in next(self.nmea_object)]
-                try:
-                    for nmea in nmea_list:
-                        self.conn.sendall(nmea.encode())
-                        time.sleep(0.05)
-                except (BrokenPipeError, OSError):
-                    self.conn.close()
-                    # print(f'\n*** Connection closed with {self.ip_add[0]}:{self.ip_add[1]} ***')
-                    logging.info(f'Connection closed with {self.ip_add[0]}:{self.ip_add[1]}')
-                    # Close thread
-                    sys.exit()
-            time.sleep(max(1 - (time.perf_counter() - timer_start), 0))
+
+def broadcast_nmea(payload: bytes, sel: selectors.BaseSelector, clients: dict) -> None:
+    """
+    Function queues the same NMEA data for all connected clients and sends it without blocking.
+    Clients which don't read the data (pending data exceeds CLIENT_MAX_PENDING) are removed.
+    """
+    for client in list(clients.values()):
+        if len(client.pending) > CLIENT_MAX_PENDING:
+            drop_client(client, sel, clients)
+            continue
+        client.pending += payload
+        send_to_client(client, sel, clients)
+
+
+class NmeaSrvThread(threading.Thread):
+    """
+    A base class that represents a thread dedicated for sending NMEA data.
+    """
+    def __init__(self, nmea_object, ip_add=None, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.ip_add = ip_add
+        self.nmea_object = nmea_object
 
 
 class NmeaStreamThread(NmeaSrvThread):
@@ -118,50 +274,43 @@ class NmeaStreamThread(NmeaSrvThread):
         if self.proto == 'tcp':
             try:
                 with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+                    # Socket options are set before connect - they apply from the first segment.
+                    tcp_socket_setup(s)
                     s.connect((self.ip_add, self.port))
                     print(f'\n*** Sending NMEA data - TCP stream to {self.ip_add}:{self.port}... ***\n')
+                    next_tick = time.perf_counter()
                     while True:
-                        timer_start = time.perf_counter()
-                        with self._lock:
-                            # Nmea object speed and heading update
-                            if self.heading and self.heading != self._heading_cache:
-                                self.nmea_object.heading_targeted = self.heading
-                                self._heading_cache = self.heading
-                            if self.speed and self.speed != self._speed_cache:
-                                self.nmea_object.speed_targeted = self.speed
-                                self._speed_cache = self.speed
-                            nmea_list = [f'{_}' for _ in next(self.nmea_object)]
-                            for nmea in nmea_list:
-                                s.send(nmea.encode())
-                                time.sleep(0.05)
-                            # Start next loop after 1 sec
-                        time.sleep(1 - (time.perf_counter() - timer_start))
-            except (OSError, TimeoutError, ConnectionRefusedError, BrokenPipeError) as err:
+                        s.sendall(next_payload(self.nmea_object))
+                        # Start next loop after 1 sec
+                        next_tick = wait_next_tick(next_tick)
+            except OSError as err:
                 print(f'\n*** Error: {err.strerror} ***\n')
                 exit_script()
         elif self.proto == 'udp':
-            with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
-                print(f'\n*** Sending NMEA data - UDP stream to {self.ip_add}:{self.port}... ***\n')
-                while True:
-                    timer_start = time.perf_counter()
-                    with self._lock:
-                        # Nmea object speed and heading update
-                        if self.heading and self.heading != self._heading_cache:
-                            self.nmea_object.heading_targeted = self.heading
-                            self._heading_cache = self.heading
-                        if self.speed and self.speed != self._speed_cache:
-                            self.nmea_object.speed_targeted = self.speed
-                            self._speed_cache = self.speed
-                        nmea_list = [f'{_}' for _ in next(self.nmea_object)]
-                        for nmea in nmea_list:
+            try:
+                with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
+                    set_send_buffer(s, UDP_SNDBUF_SIZE)
+                    # Connected UDP socket - destination address is resolved once, not on every send.
+                    s.connect((self.ip_add, self.port))
+                    # Non-blocking socket - the stream never stalls on a full send buffer.
+                    s.setblocking(False)
+                    print(f'\n*** Sending NMEA data - UDP stream to {self.ip_add}:{self.port}... ***\n')
+                    next_tick = time.perf_counter()
+                    while True:
+                        for datagram in udp_datagrams(next_payload(self.nmea_object)):
                             try:
-                                s.sendto(nmea.encode(), (self.ip_add, self.port))
-                                time.sleep(0.05)
-                            except OSError as err:
-                                print(f'*** Error: {err.strerror} ***')
-                                exit_script()
+                                s.send(datagram)
+                            except BlockingIOError:
+                                # Send buffer full - drop the rest of this tick, the next tick carries fresh data.
+                                break
+                            except ConnectionRefusedError:
+                                # ICMP port unreachable reported by connected socket - no listener (yet) on remote host
+                                pass
                         # Start next loop after 1 sec
-                    time.sleep(1 - (time.perf_counter() - timer_start))
+                        next_tick = wait_next_tick(next_tick)
+            except OSError as err:
+                print(f'*** Error: {err.strerror} ***')
+                exit_script()
 
 
 class NmeaSerialThread(NmeaSrvThread):
@@ -172,7 +321,18 @@ class NmeaSerialThread(NmeaSrvThread):
         super().__init__(*args, **kwargs)
         self.serial_config = serial_config
 
+    @property
+    def serial_bytes_per_sec(self) -> float:
+        """
+        Return the number of bytes the serial port can transmit per second (start + data + parity + stop bits).
+        """
+        parity_bits = 0 if self.serial_config['parity'] == 'N' else 1
+        frame_bits = 1 + self.serial_config['bytesize'] + parity_bits + self.serial_config['stopbits']
+        return int(self.serial_config['baudrate']) / frame_bits
+
     def run(self):
+        # Modules used only in the serial mode are imported on demand.
+        import serial
         # Open serial port.
         try:
             with serial.Serial(self.serial_config['port'], baudrate=self.serial_config['baudrate'],
@@ -183,24 +343,20 @@ class NmeaSerialThread(NmeaSrvThread):
                 print(
                     f'Serial port settings: {self.serial_config["port"]} {self.serial_config["baudrate"]} '
                     f'{self.serial_config["bytesize"]}{self.serial_config["parity"]}{self.serial_config["stopbits"]}')
+                # Windows only - driver buffer big enough for the whole NMEA burst of one tick
+                if hasattr(ser, 'set_buffer_size'):
+                    ser.set_buffer_size(rx_size=SERIAL_BUFFER_SIZE, tx_size=SERIAL_BUFFER_SIZE)
                 print('Sending NMEA data...')
+                if len(self.nmea_object.payload) > self.serial_bytes_per_sec:
+                    log.warning('Baudrate %s is too low to send all NMEA sentences every second',
+                                self.serial_config['baudrate'])
+                next_tick = time.perf_counter()
                 while True:
-                    timer_start = time.perf_counter()
-                    with self._lock:
-                        # Nmea object speed and heading update
-                        if self.heading and self.heading != self._heading_cache:
-                            self.nmea_object.heading_targeted = self.heading
-                            self._heading_cache = self.heading
-                        if self.speed and self.speed != self._speed_cache:
-                            self.nmea_object.speed_targeted = self.speed
-                            self._speed_cache = self.speed
-                        nmea_list = [f'{_}' for _ in next(self.nmea_object)]
-                        for nmea in nmea_list:
-                            ser.write(str.encode(nmea))
-                            time.sleep(0.05)
-                    time.sleep(1 - (time.perf_counter() - timer_start))
+                    # The whole group is written at once - the UART itself paces the output
+                    ser.write(next_payload(self.nmea_object))
+                    next_tick = wait_next_tick(next_tick)
         except serial.serialutil.SerialException as error:
             # Remove error number from output [...]
-            error_formatted = re.sub(r'\[(.*?)\]', '', str(error)).strip().replace('  ', ' ').capitalize()
-            logging.error(f"{error_formatted}. Please try \'sudo chmod a+rw {self.serial_config['port']}\'")
+            error_formatted = _BRACKET_RE.sub('', str(error)).strip().replace('  ', ' ').capitalize()
+            log.error("%s. Please try 'sudo chmod a+rw %s'", error_formatted, self.serial_config['port'])
             exit_script()
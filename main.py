@@ -9,7 +9,25 @@ import logging
 from nmea_gps import NmeaMsg
 from utils import position_input, ip_port_input, trans_proto_input, heading_input, speed_input, \
     heading_speed_input, serial_config_input
-from custom_thread import NmeaStreamThread, NmeaSerialThread, run_telnet_server_thread
+from custom_thread import NmeaStreamThread, NmeaSerialThread, run_telnet_server_thread, set_heading_speed
+
+
+# Banner and emulator options - written to the terminal at once
+MENU = r'''
+
+..####...#####....####...........######..##...##..##..##..##.......####...######...####...#####..
+.##......##..##..##..............##......###.###..##..##..##......##..##....##....##..##..##..##.
+.##.###..#####....####...........####....##.#.##..##..##..##......######....##....##..##..#####..
+.##..##..##..........##..........##......##...##..##..##..##......##..##....##....##..##..##..##.
+..####...##.......####...........######..##...##...####...######..##..##....##.....####...##..##.
+.................................................................................................
+
+### Choose emulator option: ###
+1 - NMEA Serial
+2 - NMEA TCP Server
+3 - NMEA TCP or UDP Stream
+4 - Quit
+'''
 
 
 class Menu:
@@ -27,20 +45,7 @@ class Menu:
         }
 
     def display_menu(self):
-        print(r'''
-
-..####...#####....####...........######..##...##..##..##..##.......####...######...####...#####..
-.##......##..##..##..............##......###.###..##..##..##......##..##....##....##..##..##..##.
-.##.###..#####....####...........####....##.#.##..##..##..##......######....##....##..##..#####..
-.##..##..##..........##..........##......##...##..##..##..##......##..##....##....##..##..##..##.
-..####...##.......####...........######..##...##...####...######..##..##....##.....####...##..##.
-.................................................................................................
-        ''')
-        print('### Choose emulator option: ###')
-        print('1 - NMEA Serial')
-        print('2 - NMEA TCP Server')
-        print('3 - NMEA TCP or UDP Stream')
-        print('4 - Quit')
+        sys.stdout.write(MENU)
 
     def run(self):
         """
@@ -72,15 +77,20 @@ class Menu:
                                         altitude=nav_data_dict['gps_altitude_amsl'],
                                         speed=nav_data_dict['gps_speed'],
                                         heading=nav_data_dict['gps_heading'])
-                action()
+                try:
+                    action()
+                except KeyboardInterrupt:
+                    # The NMEA thread may stop the script (exit_script) while it is starting
+                    print('\n\n*** Closing the script... ***\n')
+                    sys.exit()
                 break
         # Changing the unit's course and speed by the user in the main thread.
         first_run = True
         while True:
-            if not self.nmea_thread.is_alive():
-                print('\n\n*** Closing the script... ***\n')
-                sys.exit()
             try:
+                if not self.nmea_thread.is_alive():
+                    print('\n\n*** Closing the script... ***\n')
+                    sys.exit()
                 if first_run:
                     time.sleep(2)
                     first_run = False
@@ -91,19 +101,9 @@ class Menu:
                     sys.exit()
                 if prompt == '':
                     new_head, new_speed = heading_speed_input()
-                    # Get all 'nmea_srv*' telnet server threads
-                    thread_list = [thread for thread in threading.enumerate() if thread.name.startswith('nmea_srv')]
-                    if thread_list:
-                        for thr in thread_list:
-                            # Update speed and heading
-                            # a = time.time()
-                            thr.set_heading(new_head)
-                            thr.set_speed(new_speed)
-                            # print(time.time() - a)
-                    else:
-                        # Set targeted head and speed without connected clients
-                        self.nmea_obj.heading_targeted = new_head
-                        self.nmea_obj.speed_targeted = new_speed
+                    # Sending threads pick up the targeted head and speed on the next position update
+                    if (new_head, new_speed) != (self.nmea_obj.heading_targeted, self.nmea_obj.speed_targeted):
+                        set_heading_speed(self.nmea_obj, new_head, new_speed)
                     print()
             except KeyboardInterrupt:
                 print('\n\n*** Closing the script... ***\n')
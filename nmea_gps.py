@@ -1,11 +1,49 @@
 import random
 from math import ceil
 import datetime
-from typing import Union
+from functools import lru_cache
+from typing import Union, NamedTuple
 
 from pyproj import Geod
 
 
+# WGS84 ellipsoid used for the unit's position updates - created once at import
+_GEOD = Geod(ellps='WGS84')
+
+
+class UtcFields(NamedTuple):
+    """
+    UTC time and date formatted for NMEA sentences.
+    """
+    time: str
+    date: str
+    date_zda: str
+
+
+@lru_cache(maxsize=1)
+def utc_fields(utc_date_time: datetime.datetime) -> UtcFields:
+    """
+    Function returns UTC time and date formatted for NMEA sentences.
+    All sentences in a group share the same timestamp, so formatting is done once per position update.
+    """
+    # Plain integer formatting - no strftime (locale-aware) calls.
+    day, month, year = utc_date_time.day, utc_date_time.month, utc_date_time.year
+    # Immutable result - it is shared (cached) by all sentences of the group
+    return UtcFields(time=f'{utc_date_time.hour:02d}{utc_date_time.minute:02d}{utc_date_time.second:02d}',
+                     date=f'{day:02d}{month:02d}{year % 100:02d}',
+                     date_zda=f'{day:02d},{month:02d},{year:04d}')
+
+
+def degrees_to_nmea(value: float, degrees_width: int) -> str:
+    """
+    Function converts decimal degrees to NMEA format (DDMM.MMM or DDDMM.MMM) rounded to 0.001 minute.
+    The sign of value is omitted - it is carried by the N/S or E/W direction field.
+    """
+    # Whole position in thousandths of a minute - rounding can't produce the '60.000' minutes
+    degrees, minutes = divmod(round(abs(value) * 60000), 60000)
+    return f'{degrees:0{degrees_width}d}{minutes // 1000:02d}.{minutes % 1000:03d}'
+
+
 class NmeaMsg:
     """
     The class represent a group of NMEA sentences.
@@ -14,6 +52,8 @@ class NmeaMsg:
         # Instance attributes
         self.utc_date_time = datetime.datetime.utcnow()
         self.position = position
+        # The unit's position in signed decimal degrees
+        self._lat, self._lon = self.position_to_degrees(position)
         self.speed = speed
         # The unit's speed provided by the user during the operation of the script
         self.speed_targeted = speed
@@ -45,6 +85,10 @@ class NmeaMsg:
                                self.gphdt,
                                self.gpvtg,
                                self.gpzda,]
+        # Encoded NMEA sentences shared by all consumers - published once per position update
+        # as a (tick_id, payload) tuple, so readers get a consistent pair with a single attribute load (no lock).
+        self._published = (0, b'')
+        self._publish_payload()
 
     def __next__(self):
         utc_date_time_prev = self.utc_date_time
@@ -64,16 +108,52 @@ class NmeaMsg:
         self.gpvtg.heading_true = self.heading
         self.gpvtg.sog_knots = self.speed
         self.gpzda.utc_time = self.utc_date_time
+        self._publish_payload()
         return self.nmea_sentences
 
     def __iter__(self):
         return self
 
     def __str__(self):
-        nmea_msgs_str = ''
-        for nmea in self.nmea_sentences:
-            nmea_msgs_str += f'{nmea}'
-        return nmea_msgs_str
+        return ''.join(str(nmea) for nmea in self.nmea_sentences)
+
+    @property
+    def payload(self) -> bytes:
+        """
+        Return all NMEA sentences (current state) encoded as one ASCII bytes object.
+        """
+        return self._published[1]
+
+    @property
+    def tick_id(self) -> int:
+        """
+        Return the number of the current NMEA sentences update.
+        """
+        return self._published[0]
+
+    def _publish_payload(self) -> None:
+        """
+        Encodes current NMEA sentences once, so they can be sent to any number of clients without re-encoding.
+        """
+        # NMEA 0183 is 7-bit ASCII - the whole group is encoded with a single call
+        payload_bytes = str(self).encode('ascii')
+        self._published = (self._published[0] + 1, payload_bytes)
+
+    @staticmethod
+    def position_to_degrees(position: dict) -> tuple:
+        """
+        Converts NMEA position (DDMM.MMM / DDDMM.MMM strings and N/S, E/W directions) to signed
+        decimal degrees - format compatible with 'Geod.fwd' func. Returns (latitude, longitude) tuple.
+        """
+        lat_a = position['latitude_value']
+        lon_a = position['longitude_value']
+        lat = float(lat_a[:2]) + (float(lat_a[2:]) / 60)
+        lon = float(lon_a[:3]) + (float(lon_a[3:]) / 60)
+        if position['latitude_direction'].lower() != 'n':
+            lat = -lat
+        if position['longitude_direction'].lower() != 'e':
+            lon = -lon
+        return lat, lon
 
     def position_update(self, utc_date_time_prev: datetime):
         """
@@ -85,24 +165,10 @@ class NmeaMsg:
         speed_ms = self.speed * 0.514444
         # Distance in meters.
         distance = speed_ms * time_delta
-        # Assignment of coords.
-        lat_a = self.position['latitude_value']
-        lat_direction = self.position['latitude_direction']
-        lon_a = self.position['longitude_value']
-        lon_direction = self.position['longitude_direction']
-        # Convert current position (start position) format to compatible with 'Geod.fwd' func.
-        if lat_direction.lower() == 'n':
-            lat_start = float(lat_a[:2]) + (float(lat_a[2:]) / 60)
-        else:
-            lat_start = - float(lat_a[:2]) - (float(lat_a[2:]) / 60)
-        if lon_direction.lower() == 'e':
-            lon_start = float(lon_a[:3]) + (float(lon_a[3:]) / 60)
-        else:
-            lon_start = - float(lon_a[:3]) - (float(lon_a[3:]) / 60)
-        # Use WGS84 ellipsoid.
-        g = Geod(ellps='WGS84')
         # Forward transformation - returns longitude, latitude, back azimuth of terminus points
-        lon_end, lat_end, back_azimuth = g.fwd(lon_start, lat_start, self.heading, distance)
+        lon_end, lat_end, back_azimuth = _GEOD.fwd(self._lon, self._lat, self.heading, distance)
+        # Current position is kept as floats - no string parsing (and rounding) on each update
+        self._lat, self._lon = lat_end, lon_end
         # Change direction when cross the equator or prime meridian (Greenwich)
         if lat_end >= 0:
             lat_direction = 'N'
@@ -112,28 +178,11 @@ class NmeaMsg:
             lon_direction = 'E'
         else:
             lon_direction = 'W'
-        lon_end, lat_end = abs(lon_end), abs(lat_end)
         # New GPS position after calculation.
-        lat_degrees = int(lat_end)
-        try:
-            lat_minutes = round(lat_end % int(lat_end) * 60, 3)
-        except ZeroDivisionError:
-            lat_minutes = round(lat_end * 60, 3)
-        if lat_minutes == 60:
-            lat_degrees += 1
-            lat_minutes = 0
-        lon_degrees = int(lon_end)
-        try:
-            lon_minutes = round(lon_end % int(lon_end) * 60, 3)
-        except ZeroDivisionError:
-            lon_minutes = round(lon_end * 60, 3)
-        if lon_minutes == 60:
-            lon_degrees += 1
-            lon_minutes = 0
-        self.position['latitude_value'] = f'{lat_degrees:02}{lat_minutes:06.3f}'
-        self.position['latitude_direction'] = f'{lat_direction.upper()}'
-        self.position['longitude_value'] = f'{lon_degrees:03}{lon_minutes:06.3f}'
-        self.position['longitude_direction'] = f'{lon_direction.upper()}'
+        self.position['latitude_value'] = degrees_to_nmea(lat_end, 2)
+        self.position['latitude_direction'] = lat_direction
+        self.position['longitude_value'] = degrees_to_nmea(lon_end, 3)
+        self.position['longitude_direction'] = lon_direction
 
     def _heading_update(self):
         """
@@ -206,15 +255,12 @@ class NmeaMsg:
         and returns NMEA check-sum in hexadecimal notation.
         """
         check_sum: int = 0
-        for char in data:
-            num = bytearray(char, encoding='utf-8')[0]
+        # Iterating over bytes object yields ints directly (no per-char object allocation).
+        for num in data.encode('ascii'):
             # XOR operation.
-            check_sum = (check_sum ^ num)
-        # Returns only hex digits string without leading 0x.
-        hex_str: str = str(hex(check_sum))[2:]
-        if len(hex_str) == 2:
-            return hex_str.upper()
-        return f'0{hex_str}'.upper()
+            check_sum ^= num
+        # Returns two uppercase hex digits string without leading 0x.
+        return f'{check_sum:02X}'
 
 
 class Gpgga:
@@ -242,7 +288,7 @@ class Gpgga:
 
     @utc_time.setter
     def utc_time(self, value) -> None:
-        self._utc_time = value.strftime('%H%M%S')
+        self._utc_time = utc_fields(value).time
 
     def __str__(self) -> str:
         nmea_output = f'{self.sentence_id},{self.utc_time}.00,{self.position["latitude_value"]},' \
@@ -275,7 +321,7 @@ class Gpgll:
 
     @utc_time.setter
     def utc_time(self, value) -> None:
-        self._utc_time = value.strftime('%H%M%S')
+        self._utc_time = utc_fields(value).time
 
     def __str__(self):
         nmea_output = f'{self.sentence_id},{self.position["latitude_value"]},' \
@@ -314,8 +360,9 @@ class Gprmc:
 
     @utc_time.setter
     def utc_time(self, value) -> None:
-        self._utc_time = value.strftime('%H%M%S')
-        self._utc_date = value.strftime('%d%m%y')
+        fields = utc_fields(value)
+        self._utc_time = fields.time
+        self._utc_date = fields.date
 
     @property
     def utc_date(self) -> str:
@@ -323,7 +370,7 @@ class Gprmc:
 
     @utc_date.setter
     def utc_date(self, value) -> None:
-        self._utc_date = value.strftime('%d%m%y')
+        self._utc_date = utc_fields(value).date
 
     def __str__(self):
         nmea_output = f'{self.sentence_id},{self.utc_time}.000,{self.data_status},' \
@@ -342,6 +389,10 @@ class Gpgsa:
     sentence_id: str = 'GPGSA'
 
     def __init__(self, gpgsv_group, select_mode='A', mode=3, pdop=1.56, hdop=0.92, vdop=1.25):
+        # Sentence data doesn't change during the script operation - the sentence is built once
+        # and rebuilt only when any of its fields has changed
+        self._nmea_str = None
+        self._nmea_fields = None
         self.select_mode = select_mode
         self.mode = mode
         self.sats_ids = gpgsv_group.sats_ids
@@ -362,14 +413,18 @@ class Gpgsa:
         return len(self.sats_ids)
 
     def __str__(self) -> str:
-        # IDs of sat used in position fix (12 fields), if less than 12 sats, fill fields with ''
-        sats_ids_output = self.sats_ids[:]
-        while len(sats_ids_output) < 12:
-            sats_ids_output.append('')
-        nmea_output = f'{self.sentence_id},{self.select_mode},{self.mode},' \
-                      f'{",".join(sats_ids_output)},' \
-                      f'{self.pdop},{self.hdop},{self.vdop}'
-        return f'${nmea_output}*{NmeaMsg.check_sum(nmea_output)}\r\n'
+        nmea_fields = (self.select_mode, self.mode, tuple(self.sats_ids), self.pdop, self.hdop, self.vdop)
+        if nmea_fields != self._nmea_fields:
+            # IDs of sat used in position fix (12 fields), if less than 12 sats, fill fields with ''
+            sats_ids_output = self.sats_ids[:]
+            while len(sats_ids_output) < 12:
+                sats_ids_output.append('')
+            nmea_output = f'{self.sentence_id},{self.select_mode},{self.mode},' \
+                          f'{",".join(sats_ids_output)},' \
+                          f'{self.pdop},{self.hdop},{self.vdop}'
+            self._nmea_str = f'${nmea_output}*{NmeaMsg.check_sum(nmea_output)}\r\n'
+            self._nmea_fields = nmea_fields
+        return self._nmea_str
 
 
 class GpgsvGroup:
@@ -410,10 +465,7 @@ class GpgsvGroup:
             self._sats_total = value
 
     def __str__(self) -> str:
-        gpgsv_group_str = ''
-        for gpgsv in self.gpgsv_instances:
-            gpgsv_group_str += f'{gpgsv}'
-        return gpgsv_group_str
+        return ''.join(str(gpgsv) for gpgsv in self.gpgsv_instances)
 
 
 class Gpgsv:
@@ -436,11 +488,13 @@ class Gpgsv:
             azimuth: int = random.randint(0, 359)
             snr: int = random.randint(0, 99)
             self.sats_details += f',{satellite_id},{elevation:02d},{azimuth:03d},{snr:02d}'
-
-    def __str__(self) -> str:
+        # Satellites data doesn't change during the script operation - the sentence is built once
         nmea_output = f'{self.sentence_id},{self.num_of_gsv_in_group},{self.sentence_num},' \
                       f'{self.sats_total}{self.sats_details}'
-        return f'${nmea_output}*{NmeaMsg.check_sum(nmea_output)}\r\n'
+        self._nmea_str = f'${nmea_output}*{NmeaMsg.check_sum(nmea_output)}\r\n'
+
+    def __str__(self) -> str:
+        return self._nmea_str
 
 
 class Gphdt:
@@ -501,8 +555,9 @@ class Gpzda:
 
     @utc_time.setter
     def utc_time(self, value) -> None:
-        self._utc_time = value.strftime('%H%M%S')
-        self._utc_date = value.strftime('%d,%m,%Y')
+        fields = utc_fields(value)
+        self._utc_time = fields.time
+        self._utc_date = fields.date_zda
 
     @property
     def utc_date(self) -> str:
@@ -510,7 +565,7 @@ class Gpzda:
 
     @utc_date.setter
     def utc_date(self, value) -> None:
-        self._utc_date = value.strftime('%d,%m,%Y')
+        self._utc_date = utc_fields(value).date_zda
 
     def __str__(self):
         # Local Zone not used
@@ -1,8 +1,12 @@
 import unittest
+import socket
+import selectors
 from unittest import mock
 from datetime import datetime
 
-from nmea_gps import NmeaMsg, Gprmc, Gpgga, Gpzda, Gphdt, Gpgll, GpgsvGroup
+from nmea_gps import NmeaMsg, Gprmc, Gpgga, Gpzda, Gphdt, Gpgll, Gpgsa, GpgsvGroup, degrees_to_nmea
+from custom_thread import udp_datagrams, TelnetClient, broadcast_nmea, send_to_client, CLIENT_MAX_PENDING
+from utils import parse_ip_port
 
 
 class TestNmeaGps(unittest.TestCase):
@@ -26,6 +30,11 @@ class TestNmeaGps(unittest.TestCase):
         check_sum = NmeaMsg.check_sum(test_data)
         self.assertEqual(check_sum, '59')
 
+    def test_degrees_to_nmea(self):
+        self.assertEqual(degrees_to_nmea(54.41871666, 2), '5425.123')
+        self.assertEqual(degrees_to_nmea(-18.5444, 3), '01832.664')
+        self.assertEqual(degrees_to_nmea(18.99999999, 3), '01900.000')
+
     def test_gprmc_str(self):
         expected = '$GPRMC,120944.000,A,5425.123,N,01832.664,E,12.300,123.1,090321,,,A*56\r\n'
         test_obj = Gprmc(utc_date_time=self.time,
@@ -58,6 +67,20 @@ class TestNmeaGps(unittest.TestCase):
                          position=self.position)
         self.assertEqual(test_obj.__str__(), expected)
 
+    def test_gpgsa_str_update(self):
+        test_obj = Gpgsa(gpgsv_group=GpgsvGroup())
+        self.assertIn(',1.56,0.92,1.25*', test_obj.__str__())
+        test_obj.pdop, test_obj.mode = 2.1, 2
+        self.assertIn(',A,2,', test_obj.__str__())
+        self.assertIn(',2.1,0.92,1.25*', test_obj.__str__())
+
+    def test_nmea_msg_payload(self):
+        test_obj = NmeaMsg(position=self.position, altitude=self.altitude, speed=self.speed, heading=self.course)
+        tick_id = test_obj.tick_id
+        next(test_obj)
+        self.assertEqual(test_obj.tick_id, tick_id + 1)
+        self.assertEqual(test_obj.payload, str(test_obj).encode('ascii'))
+
     @mock.patch('random.randint')
     @mock.patch('random.sample')
     def test_gpgsv_group(self, mock_random_sample, mock_random_randint):
@@ -71,5 +94,95 @@ class TestNmeaGps(unittest.TestCase):
         self.assertEqual(test_obj.__str__(), expected)
 
 
+class TestNmeaTransport(unittest.TestCase):
+    """
+    Tests for NMEA data transport helpers.
+    """
+    def test_udp_datagrams(self):
+        payload = b'$GPHDT,123.1,T*34\r\n' * 5
+        datagrams = udp_datagrams(payload, max_size=60)
+        self.assertEqual([len(datagram) for datagram in datagrams], [57, 38])
+        self.assertEqual(b''.join(datagrams), payload)
+        self.assertEqual(udp_datagrams(payload), [payload])
+
+    def add_client(self, sel, clients):
+        """
+        Registers one end of a socket pair as telnet client, returns the other end (client's side).
+        """
+        conn, peer = socket.socketpair()
+        self.addCleanup(conn.close)
+        self.addCleanup(peer.close)
+        # Small socket buffers - large payload can't be sent at once
+        conn.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 4096)
+        peer.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4096)
+        conn.setblocking(False)
+        sel.register(conn, selectors.EVENT_READ)
+        clients[conn] = TelnetClient(conn, ('127.0.0.1', 10110))
+        return peer
+
+    def test_broadcast_nmea(self):
+        payload = b'$GPHDT,123.1,T*34\r\n'
+        with selectors.DefaultSelector() as sel:
+            clients = {}
+            peers = [self.add_client(sel, clients) for _ in range(3)]
+            broadcast_nmea(payload, sel, clients)
+            for peer in peers:
+                self.assertEqual(peer.recv(1024), payload)
+            for client in clients.values():
+                self.assertEqual(client.pending, b'')
+                self.assertEqual(sel.get_key(client.conn).events, selectors.EVENT_READ)
+
+    def test_broadcast_nmea_partial_send(self):
+        payload = b'$GPHDT,123.1,T*34\r\n' * 10000
+        with selectors.DefaultSelector() as sel:
+            clients = {}
+            peer = self.add_client(sel, clients)
+            client = next(iter(clients.values()))
+            broadcast_nmea(payload, sel, clients)
+            # Socket send buffer is full - the rest of the data waits for write readiness
+            self.assertTrue(client.pending)
+            self.assertEqual(sel.get_key(client.conn).events, selectors.EVENT_READ | selectors.EVENT_WRITE)
+            received = b''
+            while client.pending:
+                received += peer.recv(len(payload))
+                send_to_client(client, sel, clients)
+            while len(received) < len(payload):
+                received += peer.recv(len(payload))
+            self.assertEqual(received, payload)
+            self.assertEqual(sel.get_key(client.conn).events, selectors.EVENT_READ)
+
+    def test_broadcast_nmea_slow_client(self):
+        payload = b'$GPHDT,123.1,T*34\r\n' * 10000
+        with selectors.DefaultSelector() as sel:
+            clients = {}
+            self.add_client(sel, clients)
+            peer_fast = self.add_client(sel, clients)
+            slow_conn, fast_conn = list(clients)
+            # Fast client reads everything, slow client doesn't read at all
+            broadcast_nmea(payload, sel, clients)
+            while clients[fast_conn].pending:
+                peer_fast.recv(len(payload))
+                send_to_client(clients[fast_conn], sel, clients)
+            self.assertGreater(len(clients[slow_conn].pending), CLIENT_MAX_PENDING)
+            broadcast_nmea(payload, sel, clients)
+            self.assertNotIn(slow_conn, clients)
+            self.assertEqual(slow_conn.fileno(), -1)
+            self.assertIn(fast_conn, clients)
+
+
+class TestUserInput(unittest.TestCase):
+    """
+    Tests for user input parsing.
+    """
+    def test_parse_ip_port(self):
+        self.assertEqual(parse_ip_port('192.168.10.10:2020'), ('192.168.10.10', 2020))
+        self.assertEqual(parse_ip_port('0.0.0.0:65535'), ('0.0.0.0', 65535))
+        self.assertEqual(parse_ip_port('10.0.0.1:10116'), ('10.0.0.1', 10116))
+        for entry in ['224.0.0.1:2020', '192.168.10.256:2020', '192.168.10:2020', '192.168.10.10',
+                      '192.168.10.10:0', '192.168.10.10:65536', '192.168.10.10:20a0', ' 192.168.10.10:2020',
+                      '192.168.010.010:2020', '1.2.3.4:0080', '192.168.10.0010:2020']:
+            self.assertIsNone(parse_ip_port(entry), entry)
+
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
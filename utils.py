@@ -1,22 +1,37 @@
 import re
 import sys
 import os
-import time
-import platform
+import signal
 
-import psutil
-import serial.tools.list_ports
+
+# Input validation patterns - compiled once at import.
+_POSITION_RE = re.compile(r'''
+    ([0-8]\d[0-5]\d|9000)                               # Latitude
+    (N|S|n|s)
+    \s?
+    ([0-1][0-7]\d[0-5]\d|0[0-9]\d[0-5]\d|18000)         # Longitude
+    (E|W|e|w)
+    ''', re.VERBOSE)
+_HEADING_RE = re.compile(r'(3[0-5]\d|[0-2]\d{2}|\d{1,2})')
+_SPEED_RE = re.compile(r'(\d{1,3}(\.\d)?)')
+# Default serial port names - {OS platform: port}
+SERIAL_DEFAULT_PORTS = {'linux': '/dev/ttyUSB0', 'windows': 'COM1'}
+# Serial port baudrates available for selection.
+BAUDRATES = frozenset({'300', '600', '1200', '2400', '4800', '9600', '14400',
+                       '19200', '38400', '57600', '115200', '128000'})
 
 
 def exit_script():
     """
     The function enables to terminate the script (main thread) from the inside of child thread.
+    On POSIX SIGINT is sent to the script, so the main thread exits (and informs the user) on KeyboardInterrupt.
+    On Windows os.kill() terminates the script at once, so the user is informed here.
+    The calling thread is finished.
     """
-    current_script_pid = os.getpid()
-    current_script = psutil.Process(current_script_pid)
-    print('*** Closing the script... ***\n')
-    time.sleep(1)
-    current_script.terminate()
+    if sys.platform == 'win32':
+        print('*** Closing the script... ***\n')
+    os.kill(os.getpid(), signal.SIGINT)
+    sys.exit()
 
 
 def position_input() -> dict:
@@ -24,9 +39,9 @@ def position_input() -> dict:
     The function asks for position and checks validity of entry data.
     Function returns position.
     """
+    print('\n### Enter unit position (format - 5430N 01920E): ###')
     while True:
         try:
-            print('\n### Enter unit position (format - 5430N 01920E): ###')
             try:
                 position_data = input('>>> ')
             except KeyboardInterrupt:
@@ -41,68 +56,73 @@ def position_input() -> dict:
                     'longitude_direction': 'E',
                 }
                 return position_dict
-            position_regex_pattern = re.compile(r'''^(
-                ([0-8]\d[0-5]\d|9000)                               # Latitude
-                (N|S|n|s)
-                \s?
-                (([0-1][0-7]\d[0-5]\d)|(0[0-9]\d[0-5]\d)|18000)     # Longitude
-                (E|W|e|w)
-                )$''', re.VERBOSE)
-            mo = position_regex_pattern.fullmatch(position_data)
+            mo = _POSITION_RE.fullmatch(position_data)
             if mo:
                 # Returns position data
                 position_dict = {
-                    'latitude_value': f'{float(mo.group(2)):08.3f}',
-                    'latitude_direction': mo.group(3),
-                    'longitude_value': f'{float(mo.group(4)):09.3f}',
-                    'longitude_direction': mo.group(7),
+                    'latitude_value': f'{float(mo.group(1)):08.3f}',
+                    'latitude_direction': mo.group(2),
+                    'longitude_value': f'{float(mo.group(3)):09.3f}',
+                    'longitude_direction': mo.group(4),
                 }
                 return position_dict
-            print('\nError: Wrong entry! Try again.')
+            print('Error: Wrong entry! Try again.')
         except KeyboardInterrupt:
             print('\n\n*** Closing the script... ***\n')
             sys.exit()
 
 
+def is_decimal(value: str) -> bool:
+    """
+    The function checks if value is a plain decimal number - up to 5 digits without leading zeros
+    (e.g. '010' would be read as octal by the socket layer).
+    """
+    return value.isdigit() and len(value) <= 5 and (value == '0' or not value.startswith('0'))
+
+
+def parse_ip_port(ip_port_socket: str):
+    """
+    The function parses 'IP:port' entry. Only unicast IP addresses from range 0.0.0.0 - 223.255.255.255
+    and port numbers from range 1 - 65535 are valid.
+    Function returns tuple with IP address (str) and port number (int) or None for invalid entry.
+    """
+    if not ip_port_socket.isascii():
+        return None
+    ip_add, _, port = ip_port_socket.partition(':')
+    octets = ip_add.split('.')
+    if len(octets) != 4 or not all(is_decimal(octet) and int(octet) <= 255 for octet in octets):
+        return None
+    if int(octets[0]) > 223:
+        return None
+    if not is_decimal(port) or not 1 <= int(port) <= 65535:
+        return None
+    return ip_add, int(port)
+
+
 def ip_port_input(option: str) -> tuple:
     """
     The function asks for IP address and port number for connection.
     """
+    if option == 'telnet':
+        print('\n### Enter Local IP address and port number [0.0.0.0:10110]: ###')
+        # All available interfaces and default NMEA port.
+        ip_port_default = ('0.0.0.0', 10110)
+    else:
+        print('\n### Enter Remote IP address and port number [127.0.0.1:10110]: ###')
+        ip_port_default = ('127.0.0.1', 10110)
     while True:
         try:
-            if option == 'telnet':
-                print('\n### Enter Local IP address and port number [0.0.0.0:10110]: ###')
-                try:
-                    ip_port_socket = input('>>> ')
-                except KeyboardInterrupt:
-                    print('\n\n*** Closing the script... ***\n')
-                    sys.exit()
-                if ip_port_socket == '':
-                    # All available interfaces and default NMEA port.
-                    return ('0.0.0.0', 10110)
-            elif option == 'stream':
-                print('\n### Enter Remote IP address and port number [127.0.0.1:10110]: ###')
-                try:
-                    ip_port_socket = input('>>> ')
-                except KeyboardInterrupt:
-                    print('\n\n*** Closing the script... ***\n')
-                    sys.exit()
-                if ip_port_socket == '':
-                    return ('127.0.0.1', 10110)
-            # Regex matchs only unicast IP addr from range 0.0.0.0 - 223.255.255.255
-            # and port numbers from range 1 - 65535.
-            ip_port_regex_pattern = re.compile(r'''^(
-                ((22[0-3]\.|2[0-1][0-9]\.|1[0-9]{2}\.|[0-9]{1,2}\.)  # 1st octet
-                (25[0-5]\.|2[0-4][0-9]\.|1[0-9]{2}\.|[0-9]{1,2}\.){2}  # 2nd and 3th octet
-                (25[0-5]|2[0-4][0-9]|1[0-9]{2}|[0-9]{1,2}))            # 4th octet
-                :
-                ([1-9][0-9]{0,3}|[1-6][0-5]{2}[0-3][0-5])   # port number
-                )$''', re.VERBOSE)
-            mo = ip_port_regex_pattern.fullmatch(ip_port_socket)
-            if mo:
-                # return tuple with IP address (str) and port number (int).
-                return (mo.group(2), int(mo.group(6)))
-            print(f'\n\nError: Wrong format use - 192.168.10.10:2020.')
+            try:
+                ip_port_socket = input('>>> ')
+            except KeyboardInterrupt:
+                print('\n\n*** Closing the script... ***\n')
+                sys.exit()
+            if ip_port_socket == '':
+                return ip_port_default
+            ip_port = parse_ip_port(ip_port_socket)
+            if ip_port:
+                return ip_port
+            print('Error: Wrong format use - 192.168.10.10:2020.')
         except KeyboardInterrupt:
             print('\n*** Closing the script... ***\n')
             sys.exit()
@@ -112,9 +132,9 @@ def trans_proto_input() -> str:
     """
     The function asks for transport protocol for NMEA stream.
     """
+    print('\n### Enter transport protocol - TCP or UDP [TCP]: ###')
     while True:
         try:
-            print('\n### Enter transport protocol - TCP or UDP [TCP]: ###')
             try:
                 stream_proto = input('>>> ').strip().lower()
             except KeyboardInterrupt:
@@ -124,6 +144,7 @@ def trans_proto_input() -> str:
                 return 'tcp'
             elif stream_proto == 'udp':
                 return 'udp'
+            print('Error: Wrong entry! Try again.')
         except KeyboardInterrupt:
             print('\n\n*** Closing the script... ***\n')
             sys.exit()
@@ -133,9 +154,9 @@ def heading_input() -> float:
     """
     The function asks for the unit's course.
     """
+    print('\n### Enter unit course - range 000-359 [090]: ###')
     while True:
         try:
-            print('\n### Enter unit course - range 000-359 [090]: ###')
             try:
                 heading_data = input('>>> ')
             except KeyboardInterrupt:
@@ -143,10 +164,10 @@ def heading_input() -> float:
                 sys.exit()
             if heading_data == '':
                 return 90.0
-            heading_regex_pattern = r'(3[0-5]\d|[0-2]\d{2}|\d{1,2})'
-            mo = re.fullmatch(heading_regex_pattern, heading_data)
+            mo = _HEADING_RE.fullmatch(heading_data)
             if mo:
                 return float(mo.group())
+            print('Error: Wrong entry! Try again.')
         except KeyboardInterrupt:
             print('\n\n*** Closing the script... ***\n')
             sys.exit()
@@ -156,9 +177,9 @@ def speed_input() -> float:
     """
     The function asks for the unit's speed.
     """
+    print('\n### Enter unit speed in knots - range 0-999 [10.5]: ###')
     while True:
         try:
-            print('\n### Enter unit speed in knots - range 0-999 [10.5]: ###')
             try:
                 speed_data = input('>>> ')
             except KeyboardInterrupt:
@@ -166,13 +187,13 @@ def speed_input() -> float:
                 sys.exit()
             if speed_data == '':
                 return 10.500
-            speed_regex_pattern = r'(\d{1,3}(\.\d)?)'
-            mo = re.fullmatch(speed_regex_pattern, speed_data)
+            mo = _SPEED_RE.fullmatch(speed_data)
             if mo:
                 match = mo.group()
                 if match.startswith('0') and match != '0':
                     match = match.lstrip('0')
                 return float(match)
+            print('Error: Wrong entry! Try again.')
         except KeyboardInterrupt:
             print('\n\n*** Closing the script... ***\n')
             sys.exit()
@@ -189,8 +210,7 @@ def heading_speed_input() -> tuple:
             except KeyboardInterrupt:
                 print('\n\n*** Closing the script... ***\n')
                 sys.exit()
-            heading_regex_pattern = r'(3[0-5]\d|[0-2]\d{2}|\d{1,2})'
-            mo = re.fullmatch(heading_regex_pattern, heading_data)
+            mo = _HEADING_RE.fullmatch(heading_data)
             if mo:
                 heading_new = float(mo.group())
                 break
@@ -200,8 +220,7 @@ def heading_speed_input() -> tuple:
             except KeyboardInterrupt:
                 print('\n\n*** Closing the script... ***\n')
                 sys.exit()
-            speed_regex_pattern = r'(\d{1,3}(\.\d)?)'
-            mo = re.fullmatch(speed_regex_pattern, speed_data)
+            mo = _SPEED_RE.fullmatch(speed_data)
             if mo:
                 match = mo.group()
                 if match.startswith('0') and match != '0':
@@ -225,46 +244,36 @@ def serial_config_input() -> dict:
                   'stopbits': 1,
                   'timeout': 1}
 
+    # Modules used only in the serial mode are imported on demand.
+    import platform
+    import serial.tools.list_ports
+
     # List of available serial ports.
     ports_connected = serial.tools.list_ports.comports(include_links=False)
     # List of available serial port's names.
-    ports_connected_names = [port.device for port in ports_connected]
+    ports_connected_names = frozenset(port.device for port in ports_connected)
     print('\n### Connected Serial Ports: ###')
     for port in sorted(ports_connected):
         print(f'   - {port}')
-    # Check OS platform.
-    platform_os = platform.system()
+    # Default serial port name depends on OS platform.
+    default_port = SERIAL_DEFAULT_PORTS.get(platform.system().lower(), '/dev/ttyUSB0')
     # Asks for serial port name and checks the name validity.
+    print(f'\n### Choose Serial Port [{default_port}]: ###')
     while True:
-        if platform_os.lower() == 'linux':
-            print('\n### Choose Serial Port [/dev/ttyUSB0]: ###')
-            try:
-                serial_set['port'] = input('>>> ')
-            except KeyboardInterrupt:
-                print('\n\n*** Closing the script... ***\n')
-                sys.exit()
-            if serial_set['port'] == '':
-                serial_set['port'] = '/dev/ttyUSB0'
-            if serial_set['port'] in ports_connected_names:
-                break
-        elif platform_os.lower() == 'windows':
-            print('\n### Choose Serial Port [COM1]: ###')
-            try:
-                serial_set['port'] = input('>>> ')
-            except KeyboardInterrupt:
-                print('\n\n*** Closing the script... ***\n')
-                sys.exit()
-            if serial_set['port'] == '':
-                serial_set['port'] = 'COM1'
-            if serial_set['port'] in ports_connected_names:
-                break
-        print(f'\nError: \'{serial_set["port"]}\' is wrong port\'s name.')
+        try:
+            serial_set['port'] = input('>>> ')
+        except KeyboardInterrupt:
+            print('\n\n*** Closing the script... ***\n')
+            sys.exit()
+        if serial_set['port'] == '':
+            serial_set['port'] = default_port
+        if serial_set['port'] in ports_connected_names:
+            break
+        print(f'Error: \'{serial_set["port"]}\' is wrong port\'s name.')
 
     # Serial port settings:
-    baudrate_list = ['300', '600', '1200', '2400', '4800', '9600', '14400',
-                     '19200', '38400', '57600', '115200', '128000']
+    print('\n### Enter serial baudrate [9600]: ###')
     while True:
-        print('\n### Enter serial baudrate [9600]: ###')
         try:
             serial_set['baudrate'] = input('>>> ')
         except KeyboardInterrupt:
@@ -272,9 +281,9 @@ def serial_config_input() -> dict:
             sys.exit()
         if serial_set['baudrate'] == '':
             serial_set['baudrate'] = 9600
-        if str(serial_set['baudrate']) in baudrate_list:
+        if str(serial_set['baudrate']) in BAUDRATES:
             break
-        print(f'\n*** Error: \'{serial_set["baudrate"]}\' is wrong port\'s baudrate. ***')
+        print(f'*** Error: \'{serial_set["baudrate"]}\' is wrong port\'s baudrate. ***')
     return serial_set
 
 